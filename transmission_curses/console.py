@@ -4,12 +4,13 @@ from __future__ import annotations
 
 import trio, os, urwid
 from .rpc import TransmissionConnection
-from math import floor, inf
+from math import floor
 from .util import output, make_underline_layout, render_bytes
 from .torrent_list import TorrentListWalker
 from .torrent_detail import TorrentDetailWindow
 
-from typing import Any, List, Dict, Tuple, Optional, Union, Callable, cast
+from typing import (Any, List, Dict, Tuple, Optional, Union, Callable, Set,
+                    cast)
 
 class ConsoleHeader(urwid.WidgetWrap):
     def __init__(self):
@@ -22,14 +23,24 @@ class ConsoleHeader(urwid.WidgetWrap):
             'invert',
             'invert'
         )
+        self._conn: Optional[Tuple[str, int]] = None
+        self._conn_suffix: Optional[str] = None
+        self._last_version: Optional[str] = None
         super().__init__(w)
 
     def selectable(self):
         return True
 
     def update(self, ses: Dict[str, Any], conn: Tuple[str, int]) -> None:
-        self.verinf.set_text(f"Transmission {ses['version']} @ "
-                             f"{conn[0]}:{conn[1]}")
+        if conn != self._conn:
+            self._conn = conn
+            self._conn_suffix = f" @ {conn[0]}:{conn[1]}"
+            # force the text to be rebuilt
+            self._last_version = None
+        if ses['version'] != self._last_version:
+            self._last_version = ses['version']
+            self.verinf.set_text(f"Transmission {ses['version']}"
+                                 f"{self._conn_suffix}")
 
 class RatesWidget(urwid.WidgetWrap):
     def __init__(self):
@@ -46,26 +57,47 @@ class RatesWidget(urwid.WidgetWrap):
             ('pack', self.ul_limit),
         ])
         self.delay_msg = urwid.Text('', align='right')
+        # last strings set on dl_rate, dl_limit, ul_rate, ul_limit; set_text
+        # invalidates the canvas, so we only call it when something changed
+        self._last: Tuple[Optional[str], ...] = (None,) * 4
+        self._last_sec = -1
+        self._last_stale: Optional[bool] = None
+        self._col_count_cache: Optional[int] = None
         super().__init__(self.cols)
 
     def update_rates(self, stats, ses):
-        self.dl_rate.set_text(render_bytes(stats['downloadSpeed']))
-        self.dl_limit.set_text(f"/{ses['speed-limit-down']}K" if
-                               ses['speed-limit-down-enabled'] else '')
-        self.ul_rate.set_text(render_bytes(stats['uploadSpeed']))
-        self.ul_limit.set_text(f"/{ses['speed-limit-up']}K" if
-                               ses['speed-limit-up-enabled'] else '')
+        dl = render_bytes(stats['downloadSpeed'])
+        dll = (f"/{ses['speed-limit-down']}K" if
+               ses['speed-limit-down-enabled'] else '')
+        ul = render_bytes(stats['uploadSpeed'])
+        ull = (f"/{ses['speed-limit-up']}K" if
+               ses['speed-limit-up-enabled'] else '')
+        new = (dl, dll, ul, ull)
+        widgets = (self.dl_rate, self.dl_limit, self.ul_rate, self.ul_limit)
+        for w, old, val in zip(widgets, self._last, new):
+            if val != old:
+                w.set_text(val)
+        # only the packed limit columns affect our width
+        if (dll, ull) != (self._last[1], self._last[3]):
+            self._col_count_cache = None
+        self._last = new
 
     def update_time(self, time):
         # self.delay_msg.set_text(str(time))
         self.time_since_update = time
-        self.delay_msg.set_text(f"{floor(time):d}s ago")
-        if self.time_since_update >= 5:
-            self._w = self.delay_msg
-        else:
-            self._w = self.cols
+        sec = floor(time)
+        if sec != self._last_sec:
+            self.delay_msg.set_text(f"{sec:d}s ago")
+            self._last_sec = sec
+        stale = self.time_since_update >= 5
+        if stale != self._last_stale:
+            self._w = self.delay_msg if stale else self.cols
+            self._last_stale = stale
+            self._col_count_cache = None
 
     def col_count(self):
+        if self._col_count_cache is not None:
+            return self._col_count_cache
         rv = 0
         for w, o in self.cols.contents:
             t, v, _ = o
@@ -74,6 +106,7 @@ class RatesWidget(urwid.WidgetWrap):
             elif t == 'pack':
                 mc, mr = w.pack((180,))
                 rv += mc
+        self._col_count_cache = rv
         return rv
 
     def pack(self, size, focus=False):
@@ -98,11 +131,15 @@ class ConsoleFooter(urwid.WidgetWrap):
             }
         )
         self.time_since_update = 0.0
+        self._last_counts: Optional[str] = None
         super().__init__(w)
 
     def update(self, tl: List[Dict[str, Any]], stats: Dict[str, Any],
                ses: Dict[str, Any], dur: float) -> None:
-        self.counts.set_text(f"Torrents:{len(tl)} (request took {dur:.4f}s)")
+        counts = f"Torrents:{len(tl)} (request took {dur:.4f}s)"
+        if counts != self._last_counts:
+            self.counts.set_text(counts)
+            self._last_counts = counts
         self.rates.update_rates(stats, ses)
 
     def update_time(self, time: float) -> None:
@@ -116,23 +153,38 @@ class ConsoleMain(urwid.WidgetWrap):
         self.data = TorrentListWalker(parent=self)
         self.view = urwid.ListBox(self.data)
         self.detail_shown = False
+        # list entry for the torrent in the detail window as of its last
+        # fetch; if the entry is unchanged there's no point refetching
+        self._last_detail_entry: Optional[Dict[str, Any]] = None
+        # latest torrent list received while the list view was hidden
+        self._pending_entries: Optional[List[Dict[str, Any]]] = None
         self.parent = parent
         super().__init__(self.view)
 
     def render_torrents(self, tlist: List[Dict[str, Any]]) -> None:
-        self.data.set_entries(tlist)
-        self.jump_if_unfocused()
-        if self.detail_shown:
+        if not self.detail_shown:
+            self._pending_entries = None
+            self.data.set_entries(tlist)
+            self.jump_if_unfocused()
+        else:
+            # the detail window covers the list, so don't bother rebuilding
+            # it until it's visible again
+            self._pending_entries = tlist
             dwin = self._w
+            tid = self._w.torrent_info['id']
+            te = next((i for i in tlist if i['id'] == tid), None)
+            if te is not None and te == self._last_detail_entry:
+                return
 
             # we use dwin here so that it gets separately closed over by cb,
             # since _w in self can get changed out from under us
-            def cb(te):
-                dwin.set_data(te)
-            tid = self._w.torrent_info['id']
+            def cb(info):
+                dwin.set_data(info)
+                self._last_detail_entry = te
             self.parent.call_async_function(
                 lambda: self.parent.get_torrent_details(tid),
-                cb
+                cb,
+                key=('refresh', tid)
             )
 
     # def selectable(self) -> bool:
@@ -148,19 +200,22 @@ class ConsoleMain(urwid.WidgetWrap):
             self.jump_to_top()
 
     def jump_to_top(self) -> None:
-        if len(self.data) > 0:
-            self.view.focus_position = next(self.data.positions())
+        first = self.data.first_position()
+        if first is not None:
+            self.view.focus_position = first
 
     def show_torrent_detail(self, te):
         """This invokes a network call to fetch details, and waits until the result is
         in."""
-        def cb(te):
-            self._w = TorrentDetailWindow(te)
+        def cb(info):
+            self._w = TorrentDetailWindow(info)
             self.detail_shown = True
+            self._last_detail_entry = te
 
         self.parent.call_async_function(
             lambda: self.parent.get_torrent_details(te['id']),
-            cb
+            cb,
+            key=('show', te['id'])
         )
 
     def keypress(self, size, key):
@@ -172,12 +227,16 @@ class ConsoleMain(urwid.WidgetWrap):
             # output("hiding detail")
             self._w = self.view
             self.detail_shown = False
+            if self._pending_entries is not None:
+                self.render_torrents(self._pending_entries)
         else:
             return key
 
 class PopupItem(urwid.WidgetWrap):
     def __init__(self, text: str, trigger_char: Optional[str],
-                 callback: Optional[Callable[[], bool]]) -> None:
+                 callback: Optional[Callable[[PopupWindow], bool]]) -> None:
+        """callback is called with the PopupWindow the item was activated in,
+        and returns whether that window should be closed."""
         if trigger_char is not None:
             if len(trigger_char) != 1:
                 raise ValueError("trigger_char must be one character")
@@ -209,36 +268,43 @@ class PopupItem(urwid.WidgetWrap):
 class PopupWindow(urwid.WidgetWrap):
     def __init__(self, title: Union[str, Tuple[str, ...]],
                  lines: List[PopupItem], scroll_select: bool = False) -> None:
-        self.all_triggers: Dict[str, PopupItem] = {}
+        all_triggers: Dict[str, PopupItem] = {}
         for l in lines:
             if l.trigger is None:
                 continue
             lt = l.trigger.lower()
-            if lt in self.all_triggers:
+            if lt in all_triggers:
                 raise ValueError("trigger char may not be repeated")
-            self.all_triggers[lt] = l
+            all_triggers[lt] = l
+        # popups are small, so a scan of this beats a dict lookup
+        self._trigger_pairs = tuple(all_triggers.items())
         self.contents = urwid.Pile(lines)
         self.item_list = lines
         self.scroll_select = scroll_select
         w = urwid.LineBox(self.contents, title)
         super().__init__(w)
+        # the item list is fixed once built, so its width is too
+        self._min_cols = max(i.pack()[0] for i in lines)
 
     def keypress(self, size: Tuple[int, ...], key: str) -> Optional[str]:
         if key == 'esc':
             self.parent.close_popup()
-        elif key in self.all_triggers:
-            cb = self.all_triggers[key].callback
-            assert cb is not None
-            close = cb()
-            if close:
-                self.parent.close_popup()
-        elif self.scroll_select:
+            return None
+        for k, item in self._trigger_pairs:
+            if key == k:
+                cb = item.callback
+                assert cb is not None
+                close = cb(self)
+                if close:
+                    self.parent.close_popup()
+                return None
+        if self.scroll_select:
             if key in ['up', 'down']:
                 return super().keypress(size, key)
             elif key == 'enter':
                 cb = self.contents.focus.callback
                 assert cb is not None
-                close = cb()
+                close = cb(self)
                 if close:
                     self.parent.close_popup()
         return None
@@ -247,14 +313,14 @@ class PopupWindow(urwid.WidgetWrap):
         return True
 
     def get_min_cols(self) -> int:
-        return max(i.pack()[0] for i in self.item_list)
+        return self._min_cols
 
 class TestPopup(PopupWindow):
     def __init__(self):
         super().__init__(
             title='Testing',
             lines=[
-                PopupItem('Close', 'C', lambda: True)
+                PopupItem('Close', 'C', lambda win: True)
             ])
 
 class SortControlWindow(PopupWindow):
@@ -275,27 +341,37 @@ class SortControlWindow(PopupWindow):
         # ('Tracker', 'k', 'mainTrackerDomain'),
     ]
 
+    # the items don't depend on the instance (callbacks find the console via
+    # the window they're called with), so they're built once and shared
+    _items: Optional[List[PopupItem]] = None
+
+    class _SetSort:
+        def __init__(self, key: str) -> None:
+            self.key = key
+
+        def __call__(self, win: PopupWindow) -> bool:
+            win.parent.main.set_sort(self.key, None)
+            return True
+
+    @classmethod
+    def _build_items(cls) -> List[PopupItem]:
+        if cls._items is None:
+            items = [PopupItem(i, j, cls._SetSort(k))
+                     for i, j, k in cls.sort_orders]
+            items.append(PopupItem(
+                "Reverse", 'v',
+                # a dumb trick to both call a function and return a value from
+                # the same lambda
+                lambda win: (win.parent.main.set_sort(
+                    None, not win.parent.main.data.sort_reversed
+                ), True)[-1]))
+            cls._items = items
+        return cls._items
+
     def __init__(self):
-        items = []
-
-        def getSortLambda(k):
-            def f():
-                self.parent.main.set_sort(k, None)
-                return True
-            return f
-
-        for i, j, k in self.sort_orders:
-            items.append(PopupItem(i, j, getSortLambda(k)))
-        items.append(PopupItem(
-            "Reverse", 'v',
-            # a dumb trick to both call a function and return a value from the
-            # same lambda
-            lambda: (self.parent.main.set_sort(
-                None, not self.parent.main.data.sort_reversed
-            ), True)[-1]))
         super().__init__(
             title='Sort order',
-            lines=items,
+            lines=self._build_items(),
             scroll_select=True
         )
 
@@ -312,13 +388,19 @@ class ConsoleToplevel(urwid.WidgetWrap):
         self._nursery.start_soon(self.track_update_time)
         self.last_update = trio.current_time()
         self.popup_open = False
+        # the sort popup and its overlay are kept around and reused each
+        # time it's shown
+        self._sort_popup: Optional[SortControlWindow] = None
+        self._sort_overlay: Optional[urwid.Overlay] = None
         super().__init__(self.fr)
         self.fr.focus_position = 'header'
 
         self.q_time = None
         self.q_count = 0
 
-        self.callback_send, self.callback_recv = trio.open_memory_channel(inf)
+        self.callback_send, self.callback_recv = trio.open_memory_channel(4)
+        # keys of calls queued or running in handle_callbacks
+        self._inflight: Set[Any] = set()
         self._nursery.start_soon(self.handle_callbacks)
 
     def keypress(self, size: Tuple[int, ...], key: str) -> Optional[str]:
@@ -345,7 +427,10 @@ class ConsoleToplevel(urwid.WidgetWrap):
         if key == 'q':
             raise urwid.ExitMainLoop()
         elif key == 's':
-            self.show_popup(SortControlWindow())
+            if self._sort_popup is None:
+                self._sort_popup = SortControlWindow()
+            self._sort_overlay = self.show_popup(self._sort_popup,
+                                                 self._sort_overlay)
         elif key == 'esc' and self.fr.focus_position == 'body':
             self.fr.focus_position = 'header'
             self.main.jump_if_unfocused()
@@ -358,19 +443,32 @@ class ConsoleToplevel(urwid.WidgetWrap):
             else:
                 return super().keypress(size, key)
         elif key == 'down' and self.fr.focus_position == 'header':
-            self.fr.focus_position = 'body'
-            self.main.view.focus_position = next(self.main.data.positions())
+            first = self.main.data.first_position()
+            if first is not None:
+                self.fr.focus_position = 'body'
+                self.main.view.focus_position = first
         else:
             return key
 
-    def show_popup(self, win: PopupWindow) -> None:
+    def show_popup(self, win: PopupWindow,
+                   ov: Optional[urwid.Overlay] = None) -> urwid.Overlay:
+        """Shows win over the current window. If ov is an overlay previously
+        returned for the same popup, it's reused rather than building a new
+        one."""
         win.parent = self
         self.popup_open = True
-        width = win.get_min_cols()
-        self._w = urwid.Overlay(
-            win, self._w,
-            'center', ('relative', width), 'middle', 'pack'
-        )
+        if ov is None:
+            width = win.get_min_cols()
+            ov = urwid.Overlay(
+                win, self._w,
+                'center', ('relative', width), 'middle', 'pack'
+            )
+        else:
+            # going through contents (rather than setting bottom_w) makes
+            # sure the overlay gets invalidated
+            ov.contents[0] = (self._w, ov.contents[0][1])
+        self._w = ov
+        return ov
 
     def close_popup(self) -> None:
         # extract the lower window from the overlay and restore it
@@ -391,21 +489,33 @@ class ConsoleToplevel(urwid.WidgetWrap):
     # this is a cringeworthy hack of callback-based code into Trio's nice
     # coroutine system, but such are the wages of using a sync console
     # framework
-    def call_async_function(self, func, callback):
-        self.callback_send.send_nowait((func, callback))
+    #
+    # if key is given, the call is dropped while another call with the same
+    # key is still pending; calls are also dropped if the queue is full
+    def call_async_function(self, func, callback, key=None):
+        if key is not None and key in self._inflight:
+            return
+        try:
+            self.callback_send.send_nowait((func, callback, key))
+        except trio.WouldBlock:
+            return
+        if key is not None:
+            self._inflight.add(key)
 
     async def handle_callbacks(self) -> None:
-        async for func, cb in self.callback_recv:
-            # async funcs called inside a lambda, to avoid stray coroutines
-            # floating around
-            co = func()
-            rv = await co
-            cb(rv)
+        async for func, cb, key in self.callback_recv:
+            try:
+                # async funcs called inside a lambda, to avoid stray
+                # coroutines floating around
+                co = func()
+                rv = await co
+                cb(rv)
+            finally:
+                self._inflight.discard(key)
 
     async def get_torrent_details(self, tid: int) -> Dict[str, Any]:
-        tfields = (self.tr_server.get_torrents_fields +
-                   self.TORRENT_DETAIL_FIELDS)
-        rv = await self.tr_server.get_torrents(torrents=tid, fields=tfields)
+        rv = await self.tr_server.get_torrents(torrents=tid,
+                                               fields=self._detail_fields)
         # rv is a list of torrents; we know it has only one entry, so return it
         # on its own
         return rv[0]
@@ -421,14 +531,20 @@ class ConsoleToplevel(urwid.WidgetWrap):
         tr_port = 9091
         t = TransmissionConnection(tr_host, tr_port, auth)
         self.tr_server = t
+        self._detail_fields = (tuple(t.get_torrents_fields) +
+                               tuple(self.TORRENT_DETAIL_FIELDS))
+        backoff = 3.0
         while True:
             it = trio.current_time()
             try:
-                r = await t.get_torrents()
-                ses = await t.get_session()
-                stats = await t.get_session_stats()
+                r, ses, stats = await t.refresh_all()
             except Exception:
+                # don't hammer a server that's down or erroring; the footer
+                # shows how long it's been since the last good update
+                await trio.sleep(backoff)
+                backoff = min(backoff * 2, 60.0)
                 continue
+            backoff = 3.0
             ft = trio.current_time()
             self.last_update = ft
             dur = ft - it
@@ -440,8 +556,11 @@ class ConsoleToplevel(urwid.WidgetWrap):
     async def track_update_time(self) -> None:
         while True:
             ct = trio.current_time()
-            self.ftr.update_time(ct - self.last_update)
-            await trio.sleep(0.5)
+            since = ct - self.last_update
+            self.ftr.update_time(since)
+            # the display only has second resolution, so wake up right when
+            # the whole-second count since the last update ticks over
+            await trio.sleep_until(self.last_update + floor(since) + 1.0)
 
 async def main() -> None:
     palette = [('normal', 'black', 'default'),
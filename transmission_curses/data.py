@@ -5,7 +5,9 @@ from __future__ import annotations
 import attr, datetime
 from enum import Enum, Flag
 
-from typing import Union, List, Dict, Any, Optional
+from typing import Union, List, Dict, Any, Optional, Tuple, Callable
+
+_fromts = datetime.datetime.fromtimestamp
 
 class TorrentStatus(Enum):
     STOPPED = 0         # Torrent is stopped
@@ -27,7 +29,7 @@ class TorrentSeedMode(Enum):
     LIMITED = 1
     UNLIMITED = 2
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True)
 class TorrentInfo:
     """Information about a torrent, sufficient to display its status in the listing
     page."""
@@ -47,7 +49,8 @@ class TorrentInfo:
     size_when_done: int
     have_valid: int
     have_unchecked: int
-    added_date: datetime.datetime
+    # raw timestamp; see the added_date property
+    _added_date: int
     uploaded_ever: int
     error_string: str
     recheck_progress: float
@@ -67,43 +70,56 @@ class TorrentInfo:
     hash_string: str
     percent_done: float
 
+    @property
+    def added_date(self) -> datetime.datetime:
+        return _fromts(self._added_date)
+
     @classmethod
     def from_transmission_dict(cls, dct: Dict[str, Any]) -> TorrentInfo:
-        return cls(
-            id=dct['id'],
-            name=dct['name'],
-            download_dir=dct['downloadDir'],
-            status=TorrentStatus(dct['status']),
-            tracker_stats=[TrackerStatus(i) for i in dct['trackerStats']],
-            desired_available=dct['desiredAvailable'],
-            rate_download=dct['rateDownload'],
-            rate_upload=dct['rateUpload'],
-            eta=dct['eta'],
-            upload_ratio=dct['uploadRatio'],
-            size_when_done=dct['sizeWhenDone'],
-            have_valid=dct['haveValid'],
-            have_unchecked=dct['haveUnchecked'],
-            added_date=datetime.datetime.fromtimestamp(dct['addedDate']),
-            uploaded_ever=dct['uploadedEver'],
-            error_string=dct['errorString'],
-            recheck_progress=dct['recheckProgress'],
-            peers_connected=dct['peersConnected'],
-            upload_limit=dct['uploadLimit'] if dct['uploadLimited'] else None,
-            download_limit=(dct['downloadLimit'] if dct['downloadLimited']
-                            else None),
-            upload_limited=dct['uploadLimited'],
-            download_limited=dct['downloadLimited'],
-            bandwidth_priority=TorrentPriority(dct['bandwidthPriority']),
-            peers_sending=dct['peersSendingToUs'],
-            peers_receiving=dct['peersGettingFromUs'],
-            ratio_limit=dct['seedRatioLimit'],
-            ratio_mode=TorrentSeedMode(dct['seedRatioMode']),
-            private=dct['isPrivate'],
-            magnet_link=dct['magnetLink'],
-            queue_position=dct['queuePosition'],
-            hash_string=dct['hashString'],
-            percent_done=dct['percentDone'],
-        )
+        kwargs = { name: (dct[key] if conv is None else conv(dct[key]))
+                   for name, key, conv in _TORRENT_FIELDS }
+        kwargs['tracker_stats'] = [TrackerStatus.from_transmission_dict(i)
+                                   for i in dct['trackerStats']]
+        kwargs['upload_limit'] = (dct['uploadLimit'] if dct['uploadLimited']
+                                  else None)
+        kwargs['download_limit'] = (dct['downloadLimit'] if
+                                    dct['downloadLimited'] else None)
+        return cls(**kwargs)
+
+# (attribute name, Transmission key, converter or None) for every TorrentInfo
+# field that maps straight across; the rest are handled in
+# from_transmission_dict
+_TORRENT_FIELDS: List[Tuple[str, str, Optional[Callable[[Any], Any]]]] = [
+    ('id', 'id', None),
+    ('name', 'name', None),
+    ('download_dir', 'downloadDir', None),
+    ('status', 'status', TorrentStatus),
+    ('desired_available', 'desiredAvailable', None),
+    ('rate_download', 'rateDownload', None),
+    ('rate_upload', 'rateUpload', None),
+    ('eta', 'eta', None),
+    ('upload_ratio', 'uploadRatio', None),
+    ('size_when_done', 'sizeWhenDone', None),
+    ('have_valid', 'haveValid', None),
+    ('have_unchecked', 'haveUnchecked', None),
+    ('added_date', 'addedDate', None),
+    ('uploaded_ever', 'uploadedEver', None),
+    ('error_string', 'errorString', None),
+    ('recheck_progress', 'recheckProgress', None),
+    ('peers_connected', 'peersConnected', None),
+    ('upload_limited', 'uploadLimited', None),
+    ('download_limited', 'downloadLimited', None),
+    ('bandwidth_priority', 'bandwidthPriority', TorrentPriority),
+    ('peers_sending', 'peersSendingToUs', None),
+    ('peers_receiving', 'peersGettingFromUs', None),
+    ('ratio_limit', 'seedRatioLimit', None),
+    ('ratio_mode', 'seedRatioMode', TorrentSeedMode),
+    ('private', 'isPrivate', None),
+    ('magnet_link', 'magnetLink', None),
+    ('queue_position', 'queuePosition', None),
+    ('hash_string', 'hashString', None),
+    ('percent_done', 'percentDone', None),
+]
 
 class TrackerConnectState(Enum):
     INACTIVE = 0      # not planning to announce/scrape
@@ -111,7 +127,7 @@ class TrackerConnectState(Enum):
     QUEUED = 2        # announce/scrape queued
     ACTIVE = 3        # announce/scrape ongoing
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True)
 class TrackerStatus:
     """Information about the current status of a torrent relative to a given
     tracker."""
@@ -126,61 +142,84 @@ class TrackerStatus:
     is_backup: bool
     last_announce_peer_count: int
     last_announce_result: str
+    # Timestamps are stored raw and converted to datetimes on access by the
+    # properties below, since most of them are never looked at.
     # time last announce started
-    last_announce_start_time: datetime.datetime
+    _last_announce_start_time: int
     last_announce_succeeded: bool
     # time last announce finished
-    last_announce_time: datetime.datetime
+    _last_announce_time: int
     last_announce_timed_out: bool
     last_scrape_result: str
-    last_scrape_start_time: datetime.datetime
+    _last_scrape_start_time: int
     last_scrape_succeeded: bool
-    last_scrape_time: datetime.datetime
+    _last_scrape_time: int
     last_scrape_timed_out: bool
     leech_count: int
-    next_announce_time: datetime.datetime
-    next_scrape_time: datetime.datetime
+    _next_announce_time: int
+    _next_scrape_time: int
     scrape_url: str
     scrape_state: TrackerConnectState
     seed_count: int
     tier: int
 
+    @property
+    def last_announce_start_time(self) -> datetime.datetime:
+        return _fromts(self._last_announce_start_time)
+
+    @property
+    def last_announce_time(self) -> datetime.datetime:
+        return _fromts(self._last_announce_time)
+
+    @property
+    def last_scrape_start_time(self) -> datetime.datetime:
+        return _fromts(self._last_scrape_start_time)
+
+    @property
+    def last_scrape_time(self) -> datetime.datetime:
+        return _fromts(self._last_scrape_time)
+
+    @property
+    def next_announce_time(self) -> datetime.datetime:
+        return _fromts(self._next_announce_time)
+
+    @property
+    def next_scrape_time(self) -> datetime.datetime:
+        return _fromts(self._next_scrape_time)
+
     @classmethod
     def from_transmission_dict(cls, dct: Dict[str, Any]) -> TrackerStatus:
-        return cls(
-            announce_url=dct['announce'],
-            announce_state=TrackerConnectState(dct['announceState']),
-            download_count=dct['downloadCount'],
-            has_announced=dct['hasAnnounced'],
-            has_scraped=dct['hasScraped'],
-            host=dct['host'],
-            id=dct['id'],
-            is_backup=dct['isBackup'],
-            last_announce_peer_count=dct['lastAnnouncePeerCount'],
-            last_announce_result=dct['lastAnnounceResult'],
-            last_announce_start_time=datetime.datetime.fromtimestamp(
-                dct['lastAnnounceStartTime']),
-            last_announce_succeeded=dct['lastAnnounceSucceeded'],
-            last_announce_time=datetime.datetime.fromtimestamp(
-                dct['lastAnnounceTime']),
-            last_announce_timed_out=dct['lastAnnounceTimedOut'],
-            last_scrape_result=dct['lastScrapeResult'],
-            last_scrape_start_time=datetime.datetime.fromtimestamp(
-                dct['lastScrapeStartTime']),
-            last_scrape_succeeded=dct['lastScrapeSucceeded'],
-            last_scrape_time=datetime.datetime.fromtimestamp(
-                dct['lastScrapeTime']),
-            last_scrape_timed_out=dct['lastScrapeTimedOut'],
-            leech_count=dct['leecherCount'],
-            next_announce_time=datetime.datetime.fromtimestamp(
-                dct['nextAnnounceTime']),
-            next_scrape_time=datetime.datetime.fromtimestamp(
-                dct['nextScrapeTime']),
-            scrape_url=dct['scrape'],
-            scrape_state=TrackerConnectState(dct['scrapeState']),
-            seed_count=dct['seederCount'],
-            tier=dct['tier'],
-        )
+        return cls(**{ name: (dct[key] if conv is None else conv(dct[key]))
+                       for name, key, conv in _TRACKER_FIELDS })
+
+_TRACKER_FIELDS: List[Tuple[str, str, Optional[Callable[[Any], Any]]]] = [
+    ('announce_url', 'announce', None),
+    ('announce_state', 'announceState', TrackerConnectState),
+    ('download_count', 'downloadCount', None),
+    ('has_announced', 'hasAnnounced', None),
+    ('has_scraped', 'hasScraped', None),
+    ('host', 'host', None),
+    ('id', 'id', None),
+    ('is_backup', 'isBackup', None),
+    ('last_announce_peer_count', 'lastAnnouncePeerCount', None),
+    ('last_announce_result', 'lastAnnounceResult', None),
+    ('last_announce_start_time', 'lastAnnounceStartTime', None),
+    ('last_announce_succeeded', 'lastAnnounceSucceeded', None),
+    ('last_announce_time', 'lastAnnounceTime', None),
+    ('last_announce_timed_out', 'lastAnnounceTimedOut', None),
+    ('last_scrape_result', 'lastScrapeResult', None),
+    ('last_scrape_start_time', 'lastScrapeStartTime', None),
+    ('last_scrape_succeeded', 'lastScrapeSucceeded', None),
+    ('last_scrape_time', 'lastScrapeTime', None),
+    ('last_scrape_timed_out', 'lastScrapeTimedOut', None),
+    ('leech_count', 'leecherCount', None),
+    ('next_announce_time', 'nextAnnounceTime', None),
+    ('next_scrape_time', 'nextScrapeTime', None),
+    ('scrape_url', 'scrape', None),
+    ('scrape_state', 'scrapeState', TrackerConnectState),
+    ('seed_count', 'seederCount', None),
+    ('tier', 'tier', None),
+]
 
 class ScheduledDay(Flag):
     SUNDAY = (1 << 0)
@@ -194,7 +233,7 @@ class ScheduledDay(Flag):
     WEEKENDS = (SATURDAY | SUNDAY)
     ALL_DAYS = (WEEKDAYS | WEEKENDS)
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True)
 class SessionSettings:
     """Information about the current global settings."""
 
@@ -1,8 +1,8 @@
 #!python3
 
-import asks
+import asks, orjson, trio
 
-from typing import Dict, Any, Tuple, Optional, List, Union
+from typing import Dict, Any, Tuple, Optional, List, Union, Sequence
 
 class RPCError(Exception):
     def __init__(self, *args, rv=None):
@@ -14,6 +14,14 @@ def raise_for_result(rv: Dict[str, Any]) -> None:
         return
     raise RPCError("Error: " + rv['result'], rv=rv)
 
+class _PendingRequest:
+    """A request that's currently in flight, which callers making the same
+    request can wait on instead of sending their own."""
+    def __init__(self) -> None:
+        self.done = trio.Event()
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[Exception] = None
+
 class TransmissionConnection:
     STATUS_STOPPED       = 0   # Torrent is stopped
     STATUS_CHECK_WAIT    = 1   # Queued to check files
@@ -25,20 +33,47 @@ class TransmissionConnection:
 
     def __init__(self, host: str, port: int = 9091,
                  auth: Optional[Tuple[str, str]] = None) -> None:
-        self.session = asks.Session(connections=5)
+        # The session is kept for the life of the connection so its
+        # keep-alive connections get reused across polls. Each poll has the
+        # three list/session/stats requests in flight at once, plus possibly
+        # a detail fetch; size the pool so none of those wait on a socket.
+        self.session = asks.Session(connections=8)
         self.url = f'http://{host}:{port}/transmission/rpc'
         self.auth = auth
         self.sess_id = None
+        self._pending: Dict[Tuple[str, bytes], _PendingRequest] = {}
 
     async def send_request(self, method: str,
-                           args: Dict[str, Any],
-                           retry: bool = False) -> Dict[str, Any]:
+                           args: Dict[str, Any]) -> Dict[str, Any]:
+        # identical requests made while one is in flight share its result
+        key = (method, orjson.dumps(args, option=orjson.OPT_SORT_KEYS))
+        pending = self._pending.get(key)
+        if pending is not None:
+            await pending.done.wait()
+            if pending.result is None:
+                raise pending.error or RPCError("Error: request cancelled")
+            return pending.result
+
+        pending = self._pending[key] = _PendingRequest()
+        try:
+            pending.result = await self._post_request(method, args)
+            return pending.result
+        except Exception as e:
+            pending.error = e
+            raise
+        finally:
+            del self._pending[key]
+            pending.done.set()
+
+    async def _post_request(self, method: str,
+                            args: Dict[str, Any],
+                            retry: bool = False) -> Dict[str, Any]:
         # tremc uses the tag field specified by Transmission, but I cannot for
         # the life of me fathom why (some kind of demented async handling?)
 
         # anyway, I won't bother, it's useless; if you want multiple requests
         # in flight at once, call send_request in different tasks
-        hdr: Dict[str, str] = {}
+        hdr: Dict[str, str] = { 'Content-Type': 'application/json' }
         if self.sess_id:
             hdr['X-Transmission-Session-Id'] = self.sess_id
 
@@ -47,19 +82,22 @@ class TransmissionConnection:
             req_args['auth'] = asks.BasicAuth(self.auth)
 
         data = { 'method': method, 'arguments': args }
-        r = await self.session.post(self.url, json=data, **req_args)
+        r = await self.session.post(self.url, data=orjson.dumps(data),
+                                    **req_args)
 
         if r.status_code == 409 and not retry:
             # Transmission's anti-CSRF code
             self.sess_id = r.headers['X-Transmission-Session-Id']
-            return await self.send_request(method, args, retry=True)
+            return await self._post_request(method, args, retry=True)
         r.raise_for_status()
 
-        rv = r.json()
+        rv = orjson.loads(r.content)
         raise_for_result(rv)
         return rv
 
-    get_torrents_fields = [
+    # these are tuples so the defaults can be sent as-is without worrying
+    # about them being mutated
+    get_torrents_fields = (
         "id", "name", "downloadDir", "status", "trackerStats",
         "desiredAvailable", "rateDownload", "rateUpload", "eta",
         "uploadRatio", "sizeWhenDone", "haveValid", "haveUnchecked",
@@ -68,19 +106,19 @@ class TransmissionConnection:
         "downloadLimited", "bandwidthPriority", "peersSendingToUs",
         "peersGettingFromUs", "seedRatioLimit", "seedRatioMode", "isPrivate",
         "magnetLink", "queuePosition", "hashString", "percentDone"
-    ]
+    )
 
     async def get_torrents(self, torrents: Union[List[Union[int, str]],
                                                  int, str, None] = None,
-                           fields: List[str] =
+                           fields: Sequence[str] =
                            get_torrents_fields) -> List[Dict[str, Any]]:
-        args: Dict[str, Any] = { 'fields': fields.copy() }
+        args: Dict[str, Any] = { 'fields': fields }
         if torrents is not None:
             args['ids'] = torrents
         rv = await self.send_request('torrent-get', args)
         return rv['arguments']['torrents']
 
-    get_session_fields = [
+    get_session_fields = (
         # number     | max global download speed (KBps)
         "alt-speed-down",
         # boolean    | true means use the alt speeds
@@ -182,16 +220,39 @@ class TransmissionConnection:
         "utp-enabled",
         # string     | long version string "$version ($revision)"
         "version",
-    ]
+    )
 
-    async def get_session(self, fields: List[str] =
+    async def get_session(self, fields: Sequence[str] =
                           get_session_fields) -> Dict[str, Any]:
         args: Dict[str, Any] = {}
         if fields:
-            args['fields'] = fields.copy()
+            args['fields'] = fields
         rv = await self.send_request('session-get', args)
         return rv['arguments']
 
     async def get_session_stats(self) -> Dict[str, Any]:
         rv = await self.send_request('session-stats', {})
         return rv['arguments']
+
+    async def refresh_all(self) -> Tuple[List[Dict[str, Any]], Dict[str, Any],
+                                         Dict[str, Any]]:
+        """Fetches the torrent list, session settings and session stats, with
+        all three requests in flight at once. Returns them in that order."""
+        results: Dict[str, Any] = {}
+        errors: List[Exception] = []
+
+        # errors are collected here and re-raised afterwards, so callers see
+        # the original exception rather than a MultiError
+        async def run(name, func):
+            try:
+                results[name] = await func()
+            except Exception as e:
+                errors.append(e)
+
+        async with trio.open_nursery() as nursery:
+            nursery.start_soon(run, 'torrents', self.get_torrents)
+            nursery.start_soon(run, 'session', self.get_session)
+            nursery.start_soon(run, 'stats', self.get_session_stats)
+        if errors:
+            raise errors[0]
+        return results['torrents'], results['session'], results['stats']
@@ -4,19 +4,10 @@ import urwid
 from .util import output, make_underline_layout, ScrollableText, render_bytes
 from .torrent_list import TorrentEntry
 from . import data
-import json
-from operator import itemgetter
+import orjson
 
 def format_size(n):
-    def split_rear_three(s):
-        yield s[-3:]
-        if len(s) > 3:
-            yield from split_rear_three(s[:-3])
-
-    def format_comma(n):
-        return ','.join(reversed(list(split_rear_three(str(n)))))
-
-    return f"{format_comma(n)} [{render_bytes(n)}]" if n > 0 else 'nothing'
+    return f"{n:,} [{render_bytes(n)}]" if n > 0 else 'nothing'
 
 def percent(num, denom):
     try:
@@ -24,25 +15,33 @@ def percent(num, denom):
     except ZeroDivisionError:
         return "0.00"
 
+# blank spacer line, shared since it never changes
+_BLANK = urwid.Text('')
+
 class DetailWindowInfo(urwid.WidgetWrap):
     def __init__(self, te):
         self.torrent_info = te
         self.display_overview()
 
     def display_overview(self, upd=False):
-        # s = json.dumps(self.torrent_info, indent=2)
         te = self.torrent_info
-        wanted_n = sum(f['length'] for n, f in enumerate(te['files']) if
-                       te['wanted'][n])
+        # one pass over the file list, since it can be very long
+        wanted_n = files_complete = files_started = 0
+        wanted = te['wanted']
+        for n, f in enumerate(te['files']):
+            length = f['length']
+            done = f['bytesCompleted']
+            if wanted[n]:
+                wanted_n += length
+            if done == length:
+                files_complete += 1
+            if done > 0:
+                files_started += 1
         wanted_str = ('everything' if wanted_n == te['totalSize'] else
                       format_size(wanted_n))
         available_n = (te['desiredAvailable'] + te['haveValid'] +
                        te['haveUnchecked'])
         left_str = format_size(te['leftUntilDone'])
-        files_complete = len([i for i in te['files'] if
-                              i['bytesCompleted'] == i['length']])
-        files_started = len([i for i in te['files'] if
-                             i['bytesCompleted'] > 0])
         corrupt_str = ('nothing' if te['corruptEver'] == 0 else
                        format_size(te['corruptEver']))
         entries = [
@@ -79,31 +78,32 @@ class DetailWindowInfo(urwid.WidgetWrap):
              else 'unlimited')
             # TODO: add rest of this
         ]
-        s = ""
         mtl = max(len(i[0]) for i in entries)
-        for t, v in entries:
-            if v is None:
-                s += "\n"
-                continue
-            s += f" {t: >{mtl}}: {v}\n"
+        s = "\n".join(["" if v is None else f" {t: >{mtl}}: {v}"
+                       for t, v in entries]) + "\n"
         old_scroll = self._w.scroll_pos if upd else 0
         wid = ScrollableText(s, scroll=old_scroll)
         self._w = wid
 
     def display_raw(self, upd=False):
-        s = json.dumps(self.torrent_info, indent=2)
+        s = orjson.dumps(self.torrent_info,
+                         option=orjson.OPT_INDENT_2).decode()
         old_scroll = self._w.scroll_pos if upd else 0
         wid = ScrollableText(f"JSON size: {len(s)}\n" + s, scroll=old_scroll)
         self._w = wid
 
     def display_files(self, upd=False):
-        files_sorted = sorted(self.torrent_info['files'],
-                              key=itemgetter('name'))
-        text = ''.join(f"{(n+1): >4}"
-                       f"{percent(i['bytesCompleted'], i['length']): >9}%"
-                       f"{render_bytes(i['length']): >9}  "
-                       f"{i['name']}\n"
-                       for n, i in enumerate(files_sorted))
+        # the original index breaks ties between equal names, keeping the
+        # sort stable
+        files = self.torrent_info['files']
+        files_sorted = sorted((f['name'], n, f['bytesCompleted'], f['length'])
+                              for n, f in enumerate(files))
+        text = ''.join([f"{(n+1): >4}"
+                        f"{(done / length * 100.0 if length else 0.0): >9.2f}%"
+                        f"{render_bytes(length): >9}  "
+                        f"{name}\n"
+                        for n, (name, _, done, length) in
+                        enumerate(files_sorted)])
         old_scroll = self._w.scroll_pos if upd else 0
         wid = ScrollableText(text, scroll=old_scroll)
         self._w = wid
@@ -136,41 +136,40 @@ class TorrentDetailWindow(urwid.WidgetWrap):
         triggers = self.make_trigger_widget()
         self.info_win = DetailWindowInfo(te)
         disp = urwid.Pile([
-            ('pack', top), ('pack', urwid.Text('')),
-            ('pack', triggers), ('pack', urwid.Text('')),
+            ('pack', top), ('pack', _BLANK),
+            ('pack', triggers), ('pack', _BLANK),
             self.info_win
         ])
         self.torrent_info = te
         super().__init__(disp)
 
     def make_trigger_widget(self):
-        def get_widget(k, v):
-            wid = urwid.Text(make_underline_layout(v[0], k))
-            if k == self.mode_win:
-                wid = urwid.AttrMap(wid, {None: 'selected',
-                                          'underline': 'selected_underline'})
-            return wid
-
-        triggers = urwid.Columns(
-            [ urwid.BoxAdapter(urwid.SolidFill(' '), 1) ] +
-            [ ('pack', get_widget(k, v)) for k, v in
-              self.window_keys.items() ] +
-            [ urwid.BoxAdapter(urwid.SolidFill(' '), 1) ],
-            dividechars=2,
-        )
-        return triggers
-
-    def set_mode(self, mode):
-        upd = self.mode_win == mode
+        # one centered Text, with the current mode marked up as selected,
+        # rather than a Columns of separately wrapped Texts and fillers
+        markup = []
+        for k in self.window_keys:
+            if markup:
+                markup.append('  ')
+            markup.extend(_SELECTED_TRIGGER_LAYOUTS[k] if k == self.mode_win
+                          else _TRIGGER_LAYOUTS[k])
+        return urwid.Text(markup, align='center', wrap='clip')
+
+    def set_mode(self, mode, force=False):
+        """Switches the info window to the given mode. Re-displaying the current
+        mode only happens if force is set, i.e. when the data has changed."""
+        changed = self.mode_win != mode
+        if not changed and not force:
+            return
         self.mode_win = mode
-        self.window_keys[mode][1](self.info_win, upd)
-        self._w.contents[2] = (self.make_trigger_widget(), ('pack', None))
+        self.window_keys[mode][1](self.info_win, not changed)
+        if changed:
+            self._w.contents[2] = (self.make_trigger_widget(), ('pack', None))
 
     def set_data(self, te):
         self.torrent_info = te
         self._w.contents[0] = (TorrentEntry(te), ('pack', None))
         self.info_win.torrent_info = te
-        self.set_mode(self.mode_win)
+        self.set_mode(self.mode_win, force=True)
 
     # def selectable(self):
     #     rv = super().selectable()
@@ -189,3 +188,17 @@ class TorrentDetailWindow(urwid.WidgetWrap):
     # def render(self, size, focus=False):
     #     # output(f"DetailWindow {id(self)} rendering at {size} focus={focus}")
     #     return super().render(size, focus)
+
+def _trigger_layout(text, char, *styles):
+    # make_underline_layout gives an empty run when char is the first letter;
+    # those are dropped, since urwid cuts off the rest of a Text's markup at a
+    # zero-length run partway through it
+    return [ i for i in make_underline_layout(text, char, *styles) if i[1] ]
+
+# the menu is fixed, so its layouts only need making once
+_TRIGGER_LAYOUTS = { k: _trigger_layout(v[0], k) for k, v in
+                     TorrentDetailWindow.window_keys.items() }
+_SELECTED_TRIGGER_LAYOUTS = {
+    k: _trigger_layout(v[0], k, 'selected', 'selected_underline')
+    for k, v in TorrentDetailWindow.window_keys.items()
+}
@@ -12,6 +12,13 @@ if TYPE_CHECKING:
     # to satisfy mypy
     from .console import ConsoleMain
 
+# static labels, shared between every entry (they're never modified)
+_INDENT2 = urwid.Text('  ')
+_DOWN_LABEL = urwid.Text(' ↓')
+_ETA_LABEL = urwid.Text(' ±')
+_UP_LABEL = urwid.Text(' ↑')
+_RATIO_LABEL = urwid.Text(' ·')
+
 class TorrentEntry(urwid.WidgetWrap):
     status_text = {
         TransmissionConnection.STATUS_STOPPED: 'stopped',
@@ -23,6 +30,11 @@ class TorrentEntry(urwid.WidgetWrap):
         TransmissionConnection.STATUS_SEED: 'seeding',
     }
 
+    done_colors = {
+        TransmissionConnection.STATUS_DOWNLOAD: 'downloading_done',
+        TransmissionConnection.STATUS_SEED: 'seeding_done',
+    }
+
     @classmethod
     def get_status_text(cls, te):
         s = cls.status_text.get(te['status'], 'unknown state')
@@ -34,19 +46,43 @@ class TorrentEntry(urwid.WidgetWrap):
             s += f" ({te['queuePosition']})"
         return s
 
-    def __init__(self, te, compact=False, parent=None):
+    @classmethod
+    def get_done_color(cls, te):
+        if (te['status'] == TransmissionConnection.STATUS_DOWNLOAD and
+            te['rateDownload'] == 0):
+            return 'idle_done'
+        return cls.done_colors.get(te['status'])
+
+    @staticmethod
+    def get_peer_counts(te):
+        # Transmission reports -1 for counts it doesn't know
+        seed_count = leech_count = -1
+        for i in te['trackerStats']:
+            if i['seederCount'] > seed_count: seed_count = i['seederCount']
+            if i['leecherCount'] > leech_count: leech_count = i['leecherCount']
+        return (seed_count if seed_count != -1 else '?',
+                leech_count if leech_count != -1 else '?')
+
+    # every torrent field the entry displays
+    display_fields = (
+        'name', 'status', 'rateDownload', 'rateUpload', 'eta', 'percentDone',
+        'sizeWhenDone', 'uploadedEver', 'peersConnected', 'uploadRatio',
+        'queuePosition',
+    )
+
+    @classmethod
+    def display_key(cls, te):
+        """Returns a tuple that compares equal for two torrent dicts exactly
+        when they'd be displayed the same way."""
+        return (tuple(te[k] for k in cls.display_fields) +
+                cls.get_peer_counts(te))
+
+    def __init__(self, te, compact=False, parent=None, disp_key=None):
         self.parent = parent
+        self._disp_key = self.display_key(te) if disp_key is None else disp_key
         status = self.get_status_text(te)
-        done_color = ('idle_done' if status.startswith('idle') else
-                      'downloading_done' if status.startswith('downloading')
-                      else
-                      'seeding_done' if status.startswith('seeding') else None)
-        seed_count = (max(i['seederCount'] for i in te['trackerStats']) if
-                      te['trackerStats'] else '?')
-        if seed_count == -1: seed_count = '?'
-        leech_count = (max(i['leecherCount'] for i in te['trackerStats']) if
-                       te['trackerStats'] else '?')
-        if leech_count == -1: leech_count = '?'
+        done_color = self.get_done_color(te)
+        seed_count, leech_count = self._disp_key[-2:]
         w = urwid.Pile([
             ('pack', ColSplitAttrMap(
                 urwid.Columns([
@@ -59,7 +95,7 @@ class TorrentEntry(urwid.WidgetWrap):
                 (done_color, done_color),
                 ('not_done', 'not_done_focus'))),
             ('pack', urwid.Columns([
-                (2, urwid.Text('  ')),
+                (2, _INDENT2),
                 urwid.Text(status),
                 urwid.Text(f"{render_bytes(te['uploadedEver'])} uploaded"),
                 urwid.Text(f"{te['peersConnected']} peers connected"),
@@ -79,14 +115,14 @@ class TorrentEntry(urwid.WidgetWrap):
             nw,
             (9, urwid.Pile([
                 urwid.Columns([
-                    (2, urwid.Text(' ↓')),
+                    (2, _DOWN_LABEL),
                     (7, urwid.AttrMap(
                         urwid.Text(download_rate_str,
                                    align='right'),
                         'download_rate'))
                 ]),
                 urwid.Columns([
-                    (2, urwid.Text(' ±')),
+                    (2, _ETA_LABEL),
                     (7, urwid.AttrMap(
                         urwid.Text(eta_str, align='right'),
                         'eta'))
@@ -94,14 +130,14 @@ class TorrentEntry(urwid.WidgetWrap):
             ])),
             (10, urwid.Pile([
                 urwid.Columns([
-                    (2, urwid.Text(' ↑')),
+                    (2, _UP_LABEL),
                     (8, urwid.AttrMap(
                         urwid.Text(upload_rate_str,
                                    align='right'),
                         'upload_rate'))
                 ]),
                 urwid.Columns([
-                    (2, urwid.Text(' ·')),
+                    (2, _RATIO_LABEL),
                     (8, urwid.AttrMap(
                         urwid.Text(
                             f"{round(max(te['uploadRatio'], 0), 2):.2f}",
@@ -137,6 +173,8 @@ class TorrentListWalker(urwid.ListWalker):
     def __init__(self, parent: Optional[ConsoleMain] = None) -> None:
         self.entries: Dict[int, Tuple[Dict[str, Any], urwid.Widget]] = {}
         self.order: List[int] = []
+        # maps each position to its index in self.order
+        self._order_index: Dict[int, int] = {}
 
         self.parent = parent
 
@@ -147,6 +185,7 @@ class TorrentListWalker(urwid.ListWalker):
         self.sorts: List[Tuple[str, bool]] = [('name', False)]
 
         self.focus: Optional[int] = None
+        self._first_pos: Optional[int] = None
 
     def __len__(self) -> int:
         return len(self.entries)
@@ -160,14 +199,25 @@ class TorrentListWalker(urwid.ListWalker):
         return self.sorts[-1][1]
 
     def set_entries(self, tl: List[Dict[str, Any]]) -> None:
-        self.entries = { i['id']: (i, TorrentEntry(i, parent=self.parent))
-                         for i in tl }
+        # keep the existing widget for any torrent whose display hasn't
+        # changed, rather than rebuilding every row on every update
+        old = self.entries
+        self.entries = {}
+        for i in tl:
+            key = TorrentEntry.display_key(i)
+            prev = old.get(i['id'])
+            if prev is not None and prev[1]._disp_key == key:
+                w = prev[1]
+                w.torrent_info = i
+            else:
+                w = TorrentEntry(i, parent=self.parent, disp_key=key)
+            self.entries[i['id']] = (i, w)
         self.order = list(self.entries.keys())
         self._do_sort()
 
         if len(self.order) == 0:
             self.focus = None
-        elif self.focus not in self.order:
+        elif self.focus not in self._order_index:
             self.focus = self.order[0]
 
         self._modified()
@@ -185,25 +235,40 @@ class TorrentListWalker(urwid.ListWalker):
         self._modified()
 
     def _do_sort(self):
-        for key, rev in self.sorts:
-            self.order.sort(key=lambda x: self.entries[x][0][key],
-                            reverse=rev)
+        e = self.entries
+        sorts = self.sorts
+        # resorting on the same key overrides the earlier sort entirely
+        if len(sorts) == 2 and sorts[0][0] == sorts[1][0]:
+            sorts = sorts[1:]
+
+        # pull the sort values out in one pass, so the sort itself only calls
+        # a builtin method per entry
+        if len(sorts) == 2 and sorts[0][1] == sorts[1][1]:
+            # both sorts go the same way, so a single sort on (latest,
+            # earlier) gives the same order as two stable passes
+            (k2, _), (k1, rev) = sorts
+            tvals = { x: (e[x][0][k1], e[x][0][k2]) for x in self.order }
+            self.order.sort(key=tvals.__getitem__, reverse=rev)
+        else:
+            for key, rev in sorts:
+                vals = { x: e[x][0][key] for x in self.order }
+                self.order.sort(key=vals.__getitem__, reverse=rev)
+        self._first_pos = self.order[0] if self.order else None
+        self._order_index = { tid: n for n, tid in enumerate(self.order) }
 
     def __getitem__(self, item: int) -> urwid.Widget:
         return self.entries[item][1]
 
     def next_position(self, position: int) -> int:
-        try:
-            ind = self.order.index(position)
-        except ValueError:
+        ind = self._order_index.get(position)
+        if ind is None:
             raise IndexError()
         rv = self.order[ind + 1]
         return rv
 
     def prev_position(self, position: int) -> int:
-        try:
-            ind = self.order.index(position)
-        except ValueError:
+        ind = self._order_index.get(position)
+        if ind is None:
             raise IndexError()
         if ind == 0:
             raise IndexError()
@@ -211,11 +276,14 @@ class TorrentListWalker(urwid.ListWalker):
         return rv
 
     def set_focus(self, position: int) -> None:
-        if position not in self.order:
+        if position not in self._order_index:
             raise IndexError()
         self.focus = position
         self._modified()
 
+    def first_position(self) -> Optional[int]:
+        return self._first_pos
+
     def positions(self, reverse: bool = False):
         if not reverse:
             return iter(self.order)
@@ -2,8 +2,9 @@
 
 import urwid
 from math import floor
-import datetime
+import datetime, functools, os
 from collections import abc
+from itertools import chain
 
 from typing import Optional, Tuple, Iterator
 
@@ -33,6 +34,8 @@ class ColSplitAttrMap(urwid.AttrMap):
                     self._left_focus_map is not None
                     else self._left_attr_map)
 
+        # no canvas cache of our own: the wrapped widget never hands back the
+        # same base canvas twice, so there'd be nothing to match against
         base_canv = self._original_widget.render(size, focus=focus)
         right_canv = urwid.CompositeCanvas(base_canv)
         right_canv.fill_attr_apply(right_map)
@@ -98,6 +101,9 @@ class ScrollableText(urwid.WidgetWrap):
             return super().render(size, focus)
 
         cols, rows = size
+        # no canvas cache of our own: urwid's CanvasCache already serves
+        # repeat renders at the same size and focus, and keypress invalidates
+        # it when the scroll position moves
         text_canv = super().render((cols,), focus)
         self.text_rows = text_canv.rows()
         if self.text_rows <= rows:
@@ -107,12 +113,17 @@ class ScrollableText(urwid.WidgetWrap):
                                 rows - self.text_rows + self.scroll_pos)
         return res
 
+_BYTE_SUFFIXES = ('', 'K', 'M', 'G', 'T', 'P')
+
 def render_bytes(amt: int) -> str:
-    suffixes = ['', 'K', 'M', 'G', 'T', 'P']
-    for n, s in enumerate(suffixes):
-        if amt < 1024 ** (n + 1):
-            return f"{amt / (1024 ** n):.1f}{s}"
-    return str(amt)
+    if amt < 1024:
+        return f"{amt:.1f}"
+    # each suffix covers 10 more bits of magnitude
+    # int() so that float amounts work too
+    n = (int(amt).bit_length() - 1) // 10
+    if n >= len(_BYTE_SUFFIXES):
+        return str(amt)
+    return f"{amt / (1 << (n * 10)):.1f}{_BYTE_SUFFIXES[n]}"
 
 def render_time(secs: int) -> str:
     MINUTE = 60
@@ -139,19 +150,26 @@ def render_time(secs: int) -> str:
         years = round(secs / YEAR)
         return f"{years}Y"
 
+# debug output is only written if TR_DEBUG is set in the environment
+DEBUG = 'TR_DEBUG' in os.environ
 out = None
 def output(s):
     global out
+    if not DEBUG:
+        return
     if out is None:
-        out = open('out', 'a')
+        # line buffered, so each message is flushed as it's written
+        out = open('out', 'a', buffering=1)
     ts = datetime.datetime.now().strftime('%Y-%m-%dT%H:%M:%S')
     out.write(f"{ts} -- {s}\n")
-    out.flush()
 
+@functools.lru_cache(maxsize=128)
 def make_underline_layout(text: str, char_in: Optional[str],
                           base_style=None, underline_style='underline'):
     """Makes a Text layout list that displays the given text, with the first
-    instance of the given character underlined."""
+    instance of the given character underlined.
+
+    Results are cached and shared between callers, so don't modify them."""
     if char_in is None:
         return [text]
     ind = text.index(char_in)
@@ -159,17 +177,19 @@ def make_underline_layout(text: str, char_in: Optional[str],
             (underline_style, text[ind:ind + 1]),
             (base_style, text[ind + 1:])]
 
+# the bits of every byte value, most significant first
+_BYTE_BITS = [ tuple((b >> i) & 1 == 1 for i in range(7, -1, -1))
+               for b in range(256) ]
+
 def byte_to_bits(b: int) -> Iterator[bool]:
-    for mul in [0x80, 0x40, 0x20, 0x10, 0x08, 0x04, 0x02, 0x01]:
-        yield (b & mul != 0)
+    return iter(_BYTE_BITS[b])
 
 class Bitset(abc.Sequence):
     def __init__(self, data):
         self._bytes = data
 
     def __iter__(self) -> Iterator[bool]:
-        for i in self._bytes:
-            yield from byte_to_bits(i)
+        return bytes_to_bits(self._bytes)
 
     def __getitem__(self, ind: int) -> bool:
         bi = ind // 8
@@ -183,5 +203,4 @@ class Bitset(abc.Sequence):
         return len(self._bytes) * 8
 
 def bytes_to_bits(b: bytes) -> Iterator[bool]:
-    for i in b:
-        yield from byte_to_bits(i)
+    return chain.from_iterable(map(_BYTE_BITS.__getitem__, b))